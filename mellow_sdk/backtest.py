@@ -1,5 +1,8 @@
 import copy
-from typing import Tuple
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Tuple
 import polars as pl
 from tqdm import tqdm
 
@@ -7,6 +10,7 @@ from tqdm import tqdm
 from mellow_sdk.strategies import AbstractStrategy
 from mellow_sdk.portfolio import Portfolio
 from mellow_sdk.history import PortfolioHistory, RebalanceHistory, UniPositionsHistory
+from mellow_sdk.utils import log
 
 
 class Backtest:
@@ -69,24 +73,113 @@ class Backtest:
 
         # if every_block:
 
-        for record in df.to_dicts():
-            is_rebalanced = self.strategy.rebalance(
-                record=record, portfolio=self.portfolio
-            )
-            portfolio_snapshot = self.portfolio.snapshot(
-                timestamp=record["timestamp"],
+        # Bound methods and positions dict are looked up once, not on every row.
+        portfolio = self.portfolio
+        positions = portfolio.positions
+        rebalance = self.strategy.rebalance
+        snapshot = portfolio.snapshot
+        add_portfolio_snapshot = portfolio_history.add_snapshot
+        add_rebalance_snapshot = rebalance_history.add_snapshot
+        add_uni_snapshot = uni_history.add_snapshot
+
+        # Records are built lazily from whole-column lists, which is cheaper than
+        # ``df.to_dicts()`` extracting every row through a separate call.
+        names = df.columns
+        columns = [series.to_list() for series in df.get_columns()]
+
+        for values in zip(*columns):
+            record = dict(zip(names, values))
+            is_rebalanced = rebalance(record=record, portfolio=portfolio)
+            timestamp = record["timestamp"]
+            portfolio_snapshot = snapshot(
+                timestamp=timestamp,
                 price=record["price"],
-                block_number=record.get("price", None),
-            )
-            portfolio_history.add_snapshot(portfolio_snapshot)
-            rebalance_history.add_snapshot(record["timestamp"], is_rebalanced)
-            uni_history.add_snapshot(
-                record["timestamp"], copy.copy(self.portfolio.positions)
+                block_number=record.get("block_number", None),
             )
+            add_portfolio_snapshot(portfolio_snapshot)
+            add_rebalance_snapshot(timestamp, is_rebalanced)
+            add_uni_snapshot(timestamp, positions)
 
         return portfolio_history, rebalance_history, uni_history
 
 
+def _fold_metrics(strategy: AbstractStrategy, df: pl.DataFrame) -> pl.DataFrame:
+    """
+    | Backtest a copy of strategy on one fold and get the last row of its stats.
+    | Defined on module level, so folds can be sent to worker processes.
+
+    Args:
+        strategy: Strategy to backtest.
+        df: Fold data.
+
+    Returns:
+        Last row of ``PortfolioHistory.calculate_stats()`` with fold bounds.
+    """
+    bt = Backtest(strategy=copy.copy(strategy))
+    portfolio_history, _, _ = bt.backtest(df=df)
+    stats = portfolio_history.calculate_stats()
+
+    stats = stats.with_columns(
+        [
+            pl.col("timestamp").first().alias("fold_from"),
+            pl.col("timestamp").last().alias("fold_to"),
+        ]
+    )
+    return stats[-1]
+
+
+def _backtest_folds(
+    strategy: AbstractStrategy, df: pl.DataFrame, folds: List[pl.Series], n_jobs: int
+) -> pl.DataFrame:
+    """
+    | Backtest strategy on every fold and collect fold metrics.
+    | Folds are independent, with ``n_jobs > 1`` they are run in a pool of processes.
+    | In that case strategy must be picklable, i.e. its class importable from a module.
+
+    Args:
+        strategy: Strategy to backtest.
+        df: Data to split into folds.
+        folds: Row indices of each fold.
+        n_jobs: Number of worker processes.
+
+    Returns:
+        Metrics of each non-empty fold.
+    """
+    realized_folds = []
+    fold_dfs = []
+    for fold_num, test_idx in enumerate(folds):
+        df_test = df[test_idx]
+
+        if df_test.shape[0] == 0:
+            log.warning("Fold is empty, fold will be skipped", fold_num=fold_num)
+        else:
+            realized_folds.append(fold_num)
+            fold_dfs.append(df_test)
+
+    if n_jobs > 1:
+        # Forked children can deadlock on polars thread pool, so workers are spawned.
+        mp_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=mp_context) as executor:
+            fold_stats = list(
+                tqdm(
+                    executor.map(_fold_metrics, repeat(strategy), fold_dfs),
+                    total=len(fold_dfs),
+                )
+            )
+    else:
+        fold_stats = [_fold_metrics(strategy, df_test) for df_test in tqdm(fold_dfs)]
+
+    metrics = None
+    for stats in fold_stats:
+        if metrics is None:
+            metrics = stats
+        else:
+            metrics = metrics.vstack(stats)
+
+    metrics = metrics.with_column(pl.Series(realized_folds).alias("fold_num"))
+    return metrics
+
+
 class BacktestTimeCV:
     """
     | ``Backtest`` emulate portfolio behavior on historical data.
@@ -143,8 +236,7 @@ class BacktestTimeCV:
             right_bound += step_sec
         return test_idx
 
-    def backtest(self, df, test_sec, step_sec, tail_type_cv=False):
-        metrics = None
+    def backtest(self, df, test_sec, step_sec, tail_type_cv=False, n_jobs=1):
         if tail_type_cv:
             folds = self.get_tail_splits(df, min_test_sec=test_sec, step_sec=step_sec)
         else:
@@ -152,35 +244,7 @@ class BacktestTimeCV:
 
         assert len(folds) > 0, "there is no folds, change yours parameters"
 
-        realized_folds = []
-        for fold_num, test_idx in enumerate(tqdm(folds)):
-            df_test = df[test_idx]
-            bt = Backtest(strategy=copy.copy(self.strategy))
-
-            if df_test.shape[0] == 0:
-                print(f"fold {fold_num} is empty, fold will be skipped")
-            else:
-                portfolio_history, rebalance_history, uni_history = bt.backtest(
-                    df=df_test
-                )
-                stats = portfolio_history.calculate_stats()
-
-                stats = stats.with_columns(
-                    [
-                        pl.col("timestamp").first().alias("fold_from"),
-                        pl.col("timestamp").last().alias("fold_to"),
-                    ]
-                )
-
-                if metrics is None:
-                    metrics = stats[-1]
-                else:
-                    metrics = metrics.vstack(stats[-1])
-
-                realized_folds.append(fold_num)
-
-        metrics = metrics.with_column(pl.Series(realized_folds).alias("fold_num"))
-        return metrics
+        return _backtest_folds(self.strategy, df, folds, n_jobs)
 
 
 class BacktestBlockCV:
@@ -235,8 +299,7 @@ class BacktestBlockCV:
             right_bound += step_blocks
         return test_idx
 
-    def backtest(self, df, test_blocks, step_blocks, tail_type_cv=False):
-        metrics = None
+    def backtest(self, df, test_blocks, step_blocks, tail_type_cv=False, n_jobs=1):
         if tail_type_cv:
             folds = self.get_tail_splits(
                 df, min_test_blocks=test_blocks, step_blocks=step_blocks
@@ -248,32 +311,4 @@ class BacktestBlockCV:
 
         assert len(folds) > 0, "there is no folds, change yours parameters"
 
-        realized_folds = []
-        for fold_num, test_idx in enumerate(tqdm(folds)):
-            df_test = df[test_idx]
-            bt = Backtest(strategy=copy.copy(self.strategy))
-
-            if df_test.shape[0] == 0:
-                print(f"fold {fold_num} is empty, fold will be skipped")
-            else:
-                portfolio_history, rebalance_history, uni_history = bt.backtest(
-                    df=df_test
-                )
-                stats = portfolio_history.calculate_stats()
-
-                stats = stats.with_columns(
-                    [
-                        pl.col("timestamp").first().alias("fold_from"),
-                        pl.col("timestamp").last().alias("fold_to"),
-                    ]
-                )
-
-                if metrics is None:
-                    metrics = stats[-1]
-                else:
-                    metrics = metrics.vstack(stats[-1])
-
-                realized_folds.append(fold_num)
-
-        metrics = metrics.with_column(pl.Series(realized_folds).alias("fold_num"))
-        return metrics
+        return _backtest_folds(self.strategy, df, folds, n_jobs)
@@ -1,8 +1,14 @@
+import numpy as np
 import pandas as pd
 import polars as pl
 import datetime
+import functools
 import typing as tp
 
+from mellow_sdk.positions import UniV3Position
+
+METRIC_SUFFIXES = ("value_x", "value_y", "il_to_x", "il_to_y", "fees_x", "fees_y")
+
 
 class PortfolioHistory:
     """
@@ -12,29 +18,102 @@ class PortfolioHistory:
     """
 
     def __init__(self):
-        self.snapshots = []
+        self.columns = {}
+        self._length = 0
+        self._stats_cache = None
 
     def add_snapshot(self, snapshot: dict) -> None:
         """
-        Add portfolio snapshot to history.
+        | Add portfolio snapshot to history.
+        | Snapshots are stored column-wise, a column is padded with None
+        | for snapshots that don't contain its key.
 
         Args:
             snapshot: Dict of portfolio params.
         """
         if snapshot:
-            self.snapshots.append(snapshot)
+            columns = self.columns
+            length = self._length
+            for key, value in snapshot.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * length
+                column.append(value)
+            self._length = length + 1
+
+            if len(columns) > len(snapshot):
+                for column in columns.values():
+                    if len(column) == length:
+                        column.append(None)
+            self._stats_cache = None
+
+    @property
+    def snapshots(self) -> tp.List[dict]:
+        """
+        Portfolio snapshots restored row-wise, keys missing in a snapshot are set to None.
+        """
+        keys = list(self.columns)
+        return [dict(zip(keys, row)) for row in zip(*self.columns.values())]
 
     def to_df(self) -> pl.DataFrame:
         """
-        Transform list of portfolio snapshots to data frame.
+        Transform portfolio snapshots to data frame.
 
         Returns:
             Portfolio history data frame.
         """
-        df = pd.DataFrame(self.snapshots)
+        df = pd.DataFrame(self.columns)
         df2 = pl.from_pandas(df).sort(by=["timestamp"])
         return df2
 
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _column_buckets(columns: tp.Tuple[str, ...]) -> tp.Dict[str, tp.Tuple[str, ...]]:
+        """
+        Classify snapshot columns by metric in a single walk over column names.
+        Result is cached by column set, so all ``calculate_*`` methods share one classification.
+
+        Args:
+            columns: Portfolio history DataFrame columns.
+
+        Returns:
+            Dict from metric suffix (see ``METRIC_SUFFIXES``) to tuple of matching columns.
+            Tuples are immutable, so the cached result can't be altered by callers.
+        """
+        buckets = {suffix: [] for suffix in METRIC_SUFFIXES}
+        for col in columns:
+            for suffix in METRIC_SUFFIXES:
+                if col.endswith(suffix):
+                    buckets[suffix].append(col)
+                    break
+        return {suffix: tuple(cols) for suffix, cols in buckets.items()}
+
+    @staticmethod
+    def _sum_columns(
+        df: pl.DataFrame, cols: tp.Sequence[str], alias: str, forward_fill: bool = False
+    ) -> pl.Series:
+        """
+        Row-wise sum of the given columns, nulls count as zero.
+        Filling and summation are fused into one polars expression,
+        so the filled columns are never materialized as a separate frame.
+
+        Args:
+            df: Portfolio history DataFrame.
+            cols: Columns to sum.
+            alias: Name of resulting series.
+            forward_fill: Forward fill nulls before summation.
+
+        Returns:
+            Series with row-wise sums.
+        """
+        exprs = [pl.col(col) for col in cols]
+        if forward_fill:
+            exprs = [expr.forward_fill() for expr in exprs]
+        total = pl.fold(
+            pl.lit(0.0), lambda acc, col: acc + col, [expr.fill_null(0) for expr in exprs]
+        )
+        return df.select([total.alias(alias)])[alias]
+
     def calculate_values(self, df: pl.DataFrame) -> pl.DataFrame:
         """
         Calculate amount of X and amount of Y in ``Portfolio``.
@@ -46,11 +125,11 @@ class PortfolioHistory:
             dataframe consisting of two columns total_value_x, total_value_y.
         """
 
-        value_of_x_cols = [col for col in df.columns if "value_x" in col]
-        value_of_y_cols = [col for col in df.columns if "value_y" in col]
+        buckets = self._column_buckets(tuple(df.columns))
+        value_of_x_cols, value_of_y_cols = buckets["value_x"], buckets["value_y"]
 
-        df_x = df[value_of_x_cols].sum(axis=1).alias("total_value_x")
-        df_y = df[value_of_y_cols].sum(axis=1).alias("total_value_y")
+        df_x = self._sum_columns(df, value_of_x_cols, "total_value_x")
+        df_y = self._sum_columns(df, value_of_y_cols, "total_value_y")
         return pl.DataFrame([df_x, df_y])
 
     def calculate_ils(self, df: pl.DataFrame) -> pl.DataFrame:
@@ -64,20 +143,16 @@ class PortfolioHistory:
             Dataframe consisting of two columns total_il_x, total_il_y.
         """
         # log.info('Starting to calculate ils')
-        il_to_x_cols = [col for col in df.columns if "il_to_x" in col]
-        il_to_y_cols = [col for col in df.columns if "il_to_y" in col]
+        buckets = self._column_buckets(tuple(df.columns))
+        il_to_x_cols, il_to_y_cols = buckets["il_to_x"], buckets["il_to_y"]
 
         if il_to_x_cols:
-            df_x = (
-                df[il_to_x_cols].fill_null("forward").sum(axis=1).alias("total_il_to_x")
-            )
-            df_y = (
-                df[il_to_y_cols].fill_null("forward").sum(axis=1).alias("total_il_to_y")
-            )
+            df_x = self._sum_columns(df, il_to_x_cols, "total_il_to_x", forward_fill=True)
+            df_y = self._sum_columns(df, il_to_y_cols, "total_il_to_y", forward_fill=True)
         else:
-            data = [0] * df.shape[0]
-            df_x = pl.Series("total_il_to_x", data, dtype=pl.Float64)
-            df_y = pl.Series("total_il_to_y", data, dtype=pl.Float64)
+            zeros = np.zeros(df.height)
+            df_x = pl.Series("total_il_to_x", zeros)
+            df_y = pl.Series("total_il_to_y", zeros)
         return pl.DataFrame([df_x, df_y])
 
     def calculate_fees(self, df: pl.DataFrame) -> pl.DataFrame:
@@ -91,25 +166,15 @@ class PortfolioHistory:
             Dataframe consisting of two columns total_fees_x, total_fees_y.
         """
         # log.info('Starting to calculate fees')
-        fees_to_x_cols = [col for col in df.columns if "fees_x" in col]
-        fees_to_y_cols = [col for col in df.columns if "fees_y" in col]
+        buckets = self._column_buckets(tuple(df.columns))
+        fees_to_x_cols, fees_to_y_cols = buckets["fees_x"], buckets["fees_y"]
         if fees_to_x_cols:
-            df_x = (
-                df[fees_to_x_cols]
-                .fill_null("forward")
-                .sum(axis=1)
-                .alias("total_fees_x")
-            )
-            df_y = (
-                df[fees_to_y_cols]
-                .fill_null("forward")
-                .sum(axis=1)
-                .alias("total_fees_y")
-            )
+            df_x = self._sum_columns(df, fees_to_x_cols, "total_fees_x", forward_fill=True)
+            df_y = self._sum_columns(df, fees_to_y_cols, "total_fees_y", forward_fill=True)
         else:
-            data = [0] * df.shape[0]
-            df_x = pl.Series("total_fees_x", data, dtype=pl.Float64)
-            df_y = pl.Series("total_fees_y", data, dtype=pl.Float64)
+            zeros = np.zeros(df.height)
+            df_x = pl.Series("total_fees_x", zeros)
+            df_y = pl.Series("total_fees_y", zeros)
         return pl.DataFrame([df_x, df_y])
 
     def calculate_value_to(self, df: pl.DataFrame) -> pl.DataFrame:
@@ -180,11 +245,56 @@ class PortfolioHistory:
                 ),
             ]
         )
-        df_apy = df_performance.apply(
-            lambda x: 100 * (x[0] ** (365 / x[1]) - 1) if x[1] != 0 else 0.0
+        apy = self._annualize(
+            df_performance["performance"].to_numpy(), df_performance["days"].to_numpy()
+        )
+        return pl.DataFrame({to_col: apy})
+
+    @staticmethod
+    def _annualize(performance: np.ndarray, days: np.ndarray) -> np.ndarray:
+        """
+        Annualize relative performance in percents: ``100 * (performance ** (365 / days) - 1)``.
+        Rows with zero days get zero.
+
+        Args:
+            performance: Ratio of current metric value to initial value.
+            days: Days passed since start.
+
+        Returns:
+            Annualized metric.
+        """
+        days = days.astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            apy = np.where(days != 0, 100 * (np.power(performance, 365 / days) - 1), 0.0)
+        return apy
+
+    def calculate_apys(self, df: pl.DataFrame) -> pl.DataFrame:
+        """
+        | Calculate portfolio APY, hold APY and gAPY at once.
+        | Equivalent to ``calculate_apy_for_col`` for every value column plus ``calculate_g_apy``,
+        | but all ratios and elapsed days are evaluated in a single pass.
+
+        Args:
+            df: Dataframe with total_value_to, hold_to columns.
+
+        Returns:
+            Dataframe consisting of portfolio_apy_x, portfolio_apy_y, hold_apy_x, hold_apy_y, g_apy.
+        """
+        ratios = {
+            "portfolio_apy_x": pl.col("total_value_to_x") / pl.col("total_value_to_x").first(),
+            "portfolio_apy_y": pl.col("total_value_to_y") / pl.col("total_value_to_y").first(),
+            "hold_apy_x": pl.col("hold_to_x") / pl.col("hold_to_x").first(),
+            "hold_apy_y": pl.col("hold_to_y") / pl.col("hold_to_y").first(),
+            "g_apy": pl.col("total_value_to_x") / pl.col("hold_to_x"),
+        }
+        df_ratios = df.select(
+            [expr.alias(col) for col, expr in ratios.items()]
+            + [(pl.col("timestamp") - pl.col("timestamp").first()).dt.days().alias("days")]
+        )
+        days = df_ratios["days"].to_numpy()
+        return pl.DataFrame(
+            {col: self._annualize(df_ratios[col].to_numpy(), days) for col in ratios}
         )
-        df_apy = df_apy.rename({"apply": to_col})
-        return df_apy
 
     def calculate_information_ratio(self, df: pl.DataFrame) -> pl.DataFrame:
         """
@@ -195,26 +305,32 @@ class PortfolioHistory:
         Returns:
         """
         df_daily = df.sort('timestamp').groupby('date').last().sort('date')
+        days_inv = 1 / df_daily['date'].diff().dt.days()
 
-        df_daily['days_diff'] = df_daily['date'].diff().dt.days()
+        def daily_ret(col: str, name: str) -> pl.Series:
+            values = df_daily[col]
+            return (1 - (values / values.shift()) ** days_inv).alias(name)
 
-        df_daily['daily_ret_x'] = 1 - (df_daily['total_value_to_x'] / df_daily['total_value_to_x'].shift()) ** (
-                    1 / df_daily['days_diff'])
-        df_daily['daily_ret_y'] = 1 - (df_daily['total_value_to_y'] / df_daily['total_value_to_y'].shift()) ** (
-                    1 / df_daily['days_diff'])
-
-        df_daily['daily_hold_ret_x'] = 1 - (df_daily['hold_to_x'] / df_daily['hold_to_x'].shift()) ** (
-                    1 / df_daily['days_diff'])
-        df_daily['daily_hold_ret_y'] = 1 - (df_daily['hold_to_y'] / df_daily['hold_to_y'].shift()) ** (
-                    1 / df_daily['days_diff'])
+        df_daily = df_daily.with_columns(
+            [
+                daily_ret('total_value_to_x', 'daily_ret_x'),
+                daily_ret('total_value_to_y', 'daily_ret_y'),
+                daily_ret('hold_to_x', 'daily_hold_ret_x'),
+                daily_ret('hold_to_y', 'daily_hold_ret_y'),
+            ]
+        )
 
         df_full = df_daily.upsample("date", "1d").fill_null("backward")
 
         diff_x = df_full['daily_ret_x'] - df_full['daily_hold_ret_x']
         diff_y = df_full['daily_ret_y'] - df_full['daily_hold_ret_y']
 
-        df_full['ir_x'] = 365 ** 0.5 * diff_x.rolling_mean(window_size=0) / diff_x.rolling_std(window_size=0)
-        df_full['ir_y'] = 365 ** 0.5 * diff_y.rolling_mean(window_size=0) / diff_y.rolling_std(window_size=0)
+        df_full = df_full.with_columns(
+            [
+                (365 ** 0.5 * diff_x.rolling_mean(window_size=0) / diff_x.rolling_std(window_size=0)).alias('ir_x'),
+                (365 ** 0.5 * diff_y.rolling_mean(window_size=0) / diff_y.rolling_std(window_size=0)).alias('ir_y'),
+            ]
+        )
 
         res_df = df.join(df_full[['date', 'ir_x', 'ir_y']], on='date', how='left')[['ir_x', 'ir_y']]
 
@@ -254,48 +370,42 @@ class PortfolioHistory:
             ]
         )
 
-        df_apy = df2.apply(
-            lambda x: 100 * (x[0] ** (365 / x[1]) - 1) if x[1] != 0 else 0.0
-        )
-        df_apy = df_apy.rename({"apply": "g_apy"})
-        return df_apy
+        apy = self._annualize(df2["coef"].to_numpy(), df2["days"].to_numpy())
+        return pl.DataFrame({"g_apy": apy})
 
     def calculate_stats(self) -> pl.DataFrame:
         """
         Calculate all statistics for portfolio. Main function of class.
+        Result is cached until the next snapshot is added, every call returns its own copy.
 
         Returns:
             Portfolio statistics dataframe.
         """
+        if self._stats_cache is not None and self._stats_cache[0] == self._length:
+            return self._stats_cache[1].clone()
+
         df = self.to_df()
         df = df.with_column(pl.col('timestamp').cast(pl.Date).alias('date'))
 
-        values = self.calculate_values(df)
-        ils = self.calculate_ils(df)
-        fees = self.calculate_fees(df)
-        df_prep = pl.concat(
-            [df[['date', "timestamp", "price"]], values, ils, fees], how="horizontal"
-        )
-
-        df_to = self.calculate_value_to(df_prep)
-        df_to_ext = pl.concat([df_prep, df_to], how="horizontal")
-
-        prt_x = self.calculate_apy_for_col(df_to_ext, "total_value_to_x", "portfolio_apy_x")
-        prt_y = self.calculate_apy_for_col(df_to_ext, "total_value_to_y", "portfolio_apy_y")
-        hld_x = self.calculate_apy_for_col(df_to_ext, "hold_to_x", "hold_apy_x")
-        hld_y = self.calculate_apy_for_col(df_to_ext, "hold_to_y", "hold_apy_y")
-        g_apy = self.calculate_g_apy(df_to_ext)
-        df_apy = pl.concat(
-            [df_to_ext, prt_x, prt_y, hld_x, hld_y, g_apy], how="horizontal"
-        )
-
-        ir_df = self.calculate_information_ratio(df_apy)
-        mdd_x = self.calculate_mdd(df_apy, from_col='total_value_to_x', to_col='mdd_x')
-        mdd_y = self.calculate_mdd(df_apy, from_col='total_value_to_y', to_col='mdd_y')
-        mdd_g_apy = self.calculate_mdd(df_apy, from_col='g_apy', to_col='mdd_g_apy')
-        df_metrics = pl.concat(
-            [df_apy, ir_df, mdd_x, mdd_y, mdd_g_apy], how="horizontal"
+        # Every stage appends its columns in place to one frame instead of building
+        # a new frame with ``pl.concat`` after each step.
+        df_metrics = df[['date', "timestamp", "price"]]
+        df_metrics.hstack(self.calculate_values(df), in_place=True)
+        df_metrics.hstack(self.calculate_ils(df), in_place=True)
+        df_metrics.hstack(self.calculate_fees(df), in_place=True)
+
+        df_metrics.hstack(self.calculate_value_to(df_metrics), in_place=True)
+        df_metrics.hstack(self.calculate_apys(df_metrics), in_place=True)
+
+        ir_df = self.calculate_information_ratio(df_metrics)
+        mdd_x = self.calculate_mdd(df_metrics, from_col='total_value_to_x', to_col='mdd_x')
+        mdd_y = self.calculate_mdd(df_metrics, from_col='total_value_to_y', to_col='mdd_y')
+        mdd_g_apy = self.calculate_mdd(df_metrics, from_col='g_apy', to_col='mdd_g_apy')
+        df_metrics.hstack(
+            ir_df.get_columns() + mdd_x.get_columns() + mdd_y.get_columns() + mdd_g_apy.get_columns(),
+            in_place=True,
         )
+        self._stats_cache = (self._length, df_metrics.clone())
         return df_metrics
 
 
@@ -307,7 +417,19 @@ class RebalanceHistory:
     """
 
     def __init__(self):
-        self.rebalances = []
+        self._rebalances = {"timestamp": [], "rebalance": []}
+
+    @property
+    def rebalances(self) -> tp.List[dict]:
+        """
+        Strategy actions restored row-wise as ``{"timestamp": ..., "rebalance": ...}`` dicts.
+        """
+        return [
+            {"timestamp": timestamp, "rebalance": rebalance}
+            for timestamp, rebalance in zip(
+                self._rebalances["timestamp"], self._rebalances["rebalance"]
+            )
+        ]
 
     def add_snapshot(
         self, timestamp: datetime.datetime, portfolio_action: tp.Optional[str]
@@ -319,9 +441,10 @@ class RebalanceHistory:
             timestamp: Timestamp of snapshot.
             portfolio_action: Name of portfolio action or None. Usually it takes from ''AbstractStrategy.rebalance`` output.
         """
-        self.rebalances += [{"timestamp": timestamp, "rebalance": portfolio_action}]
+        self._rebalances["timestamp"].append(timestamp)
+        self._rebalances["rebalance"].append(portfolio_action)
 
-    def to_df(self) -> pd.DataFrame:
+    def to_df(self) -> pl.DataFrame:
         """
         | Transform list of strategy actions to data frame.
 
@@ -333,11 +456,11 @@ class RebalanceHistory:
                 [
                     pl.Series(
                         name="timestamp",
-                        values=[x["timestamp"] for x in self.rebalances],
+                        values=self._rebalances["timestamp"],
                     ),
                     pl.Series(
                         name="rebalance",
-                        values=[x["rebalance"] for x in self.rebalances],
+                        values=self._rebalances["rebalance"],
                         dtype=pl.Utf8,
                     ),
                 ]
@@ -356,7 +479,21 @@ class UniPositionsHistory:
     """
 
     def __init__(self):
-        self.positions = []
+        self._positions = {
+            "name": [],
+            "timestamp": [],
+            "lower_bound": [],
+            "upper_bound": [],
+            "liq": [],
+        }
+
+    @property
+    def positions(self) -> tp.List[dict]:
+        """
+        Uniswap positions snapshots restored row-wise, one dict per position record.
+        """
+        keys = list(self._positions)
+        return [dict(zip(keys, row)) for row in zip(*self._positions.values())]
 
     def add_snapshot(self, timestamp: datetime.datetime, positions: dict) -> None:
         """
@@ -364,18 +501,15 @@ class UniPositionsHistory:
 
         Args:
             timestamp: Timestamp of snapshot.
-            positions: List of Uniswap positions.
+            positions: Portfolio positions by name, only ``UniV3Position`` instances are recorded.
         """
         for name, position in positions.items():
-            if "Uni" in name:
-                record = {
-                    "name": name,
-                    "timestamp": timestamp,
-                    "lower_bound": position.lower_price,
-                    "upper_bound": position.upper_price,
-                    "liq": position.liquidity,
-                }
-                self.positions.append(record)
+            if isinstance(position, UniV3Position):
+                self._positions["name"].append(name)
+                self._positions["timestamp"].append(timestamp)
+                self._positions["lower_bound"].append(position.lower_price)
+                self._positions["upper_bound"].append(position.upper_price)
+                self._positions["liq"].append(position.liquidity)
 
     def to_df(self) -> pl.DataFrame:
         """
@@ -384,7 +518,7 @@ class UniPositionsHistory:
         Returns:
             Uniswap positions history data frame.
         """
-        if len(self.positions) == 0:
+        if len(self._positions["name"]) == 0:
             intervals_df = pl.DataFrame(
                 {
                     "name": [],
@@ -395,7 +529,15 @@ class UniPositionsHistory:
                 }
             )
         else:
-            intervals_df = pl.from_records(self.positions)
+            intervals_df = pl.DataFrame(
+                [
+                    pl.Series("name", self._positions["name"], dtype=pl.Utf8),
+                    pl.Series("timestamp", self._positions["timestamp"]),
+                    pl.Series("lower_bound", self._positions["lower_bound"], dtype=pl.Float64),
+                    pl.Series("upper_bound", self._positions["upper_bound"], dtype=pl.Float64),
+                    pl.Series("liq", self._positions["liq"], dtype=pl.Float64),
+                ]
+            )
         return intervals_df
 
     # def get_coverage(self, swaps_df: pd.DataFrame) -> float:
@@ -1,5 +1,4 @@
 from decimal import Decimal
-import numpy as np
 
 
 def price_after_swap_y_to_x_raw(dy: float, liq: float, sqrt_price_x96: float) -> float:
@@ -87,8 +86,8 @@ def price_after_swap_y_to_x(dy: float, liq: float, p_0: float) -> float:
     """
     assert dy > 0, "swap y to x"
     dsqrt_p = Decimal(dy) / Decimal(liq)
-    sqrt_p_1 = dsqrt_p + np.sqrt(Decimal(p_0))
-    p_1 = np.power(sqrt_p_1, 2)
+    sqrt_p_1 = dsqrt_p + Decimal(p_0).sqrt()
+    p_1 = sqrt_p_1 * sqrt_p_1
     return float(p_1)
 
 
@@ -104,9 +103,9 @@ def price_after_swap_x_to_y(dx: float, liq: float, p_0: float) -> float:
     """
     assert dx > 0, "swap y to x"
     dsqrt_p = Decimal(dx) / Decimal(liq)
-    denom = dsqrt_p + np.sqrt(1 / Decimal(p_0))
+    denom = dsqrt_p + (1 / Decimal(p_0)).sqrt()
     sqrt_p_1 = 1 / denom
-    p_1 = np.power(sqrt_p_1, 2)
+    p_1 = sqrt_p_1 * sqrt_p_1
     return float(p_1)
 
 
@@ -121,9 +120,10 @@ def tokens_x_after_swap_y_to_x(dy: float, liq: float, p_0: float) -> float:
         Amount of token X after swap.
     """
     dsqrt_p = Decimal(dy) / Decimal(liq)
-    sqrt_p_1 = dsqrt_p + np.sqrt(Decimal(p_0))
+    sqrt_p_0 = Decimal(p_0).sqrt()
+    sqrt_p_1 = dsqrt_p + sqrt_p_0
     numer = -Decimal(liq) * dsqrt_p
-    denom = np.sqrt(Decimal(p_0)) * sqrt_p_1
+    denom = sqrt_p_0 * sqrt_p_1
     dx = numer / denom
     return float(dx)
 
@@ -139,9 +139,9 @@ def tokens_y_after_swap_x_to_y(dx: float, liq: float, p_0: float) -> float:
         Amount of token Y after swap.
     """
     dsqrt_p = Decimal(dx) / Decimal(liq)
-    denom = dsqrt_p + np.sqrt(1 / Decimal(p_0))
+    denom = dsqrt_p + (1 / Decimal(p_0)).sqrt()
     sqrt_p_1 = 1 / denom
-    dy = -Decimal(liq) * dsqrt_p * sqrt_p_1 * np.sqrt(Decimal(p_0))
+    dy = -Decimal(liq) * dsqrt_p * sqrt_p_1 * Decimal(p_0).sqrt()
     return float(dy)
 
 
@@ -155,7 +155,7 @@ def tokens_y_for_swap_p_0_to_p_1(liq: float, p_0: float, p_1: float) -> float:
     Returns:
         Amount of token Y.
     """
-    dsqrt_p = np.sqrt(Decimal(p_1)) - np.sqrt(Decimal(p_0))
+    dsqrt_p = Decimal(p_1).sqrt() - Decimal(p_0).sqrt()
     dy = dsqrt_p * liq
     return dy
 
@@ -170,6 +170,6 @@ def tokens_x_for_swap_p_0_to_p_1(liq: float, p_0: float, p_1: float) -> float:
     Returns:
         Amount of token X.
     """
-    dsqrt_p = np.sqrt(Decimal(1 / p_1)) - np.sqrt(Decimal(1 / p_0))
+    dsqrt_p = Decimal(1 / p_1).sqrt() - Decimal(1 / p_0).sqrt()
     dx = dsqrt_p * liq
     return dx
@@ -105,10 +105,9 @@ class Portfolio(AbstractPosition):
         Returns:
             Total value of portfolio denominated in X.
         """
-        total_x = 0
-        for _, pos in self.positions.items():
-            total_x += pos.to_x(price)
-        return total_x
+        assert price > 1e-16, f"Incorrect price = {price}"
+        total_x, total_y = self.to_xy(price)
+        return total_x + total_y / price
 
     def to_y(self, price: float) -> float:
         """
@@ -120,10 +119,9 @@ class Portfolio(AbstractPosition):
         Returns:
             Total value of portfolio denominated in Y.
         """
-        total_y = 0
-        for _, pos in self.positions.items():
-            total_y += pos.to_y(price)
-        return total_y
+        assert price > 1e-16, f"Incorrect price = {price}"
+        total_x, total_y = self.to_xy(price)
+        return total_x * price + total_y
 
     def to_xy(self, price: float) -> Tuple[float, float]:
         """
@@ -137,7 +135,7 @@ class Portfolio(AbstractPosition):
         """
         total_x = 0
         total_y = 0
-        for _, pos in self.positions.items():
+        for pos in self.positions.values():
             x, y = pos.to_xy(price)
             total_x += x
             total_y += y
@@ -162,6 +160,6 @@ class Portfolio(AbstractPosition):
             "price": price,
             "block_number": block_number,
         }
-        for _, pos in self.positions.items():
+        for pos in self.positions.values():
             snapshot.update(pos.snapshot(timestamp, price, block_number))
         return snapshot
@@ -1,4 +1,4 @@
-from typing import Tuple, Optional
+from typing import Dict, Tuple, Optional
 from abc import ABC, abstractmethod
 from datetime import datetime
 import numpy as np
@@ -14,8 +14,14 @@ class AbstractPosition(ABC):
         name: Unique name for the position.
     """
 
+    __slots__ = ("name", "_snapshot_keys", "_snapshot_keys_name")
+
+    SNAPSHOT_SUFFIXES: Tuple[str, ...] = ()
+
     def __init__(self, name: str) -> None:
         self.name = name
+        self._snapshot_keys = ()
+        self._snapshot_keys_name = None
 
     def rename(self, new_name: str) -> None:
         """
@@ -26,6 +32,21 @@ class AbstractPosition(ABC):
         """
         self.name = new_name
 
+    def snapshot_keys(self) -> Tuple[str, ...]:
+        """
+        Get snapshot keys ``{name}_{suffix}`` for every suffix in ``SNAPSHOT_SUFFIXES``.
+        Keys are built once and rebuilt only after the position is renamed.
+
+        Returns:
+            Snapshot keys in order of ``SNAPSHOT_SUFFIXES``.
+        """
+        if self._snapshot_keys_name != self.name:
+            self._snapshot_keys = tuple(
+                f"{self.name}_{suffix}" for suffix in self.SNAPSHOT_SUFFIXES
+            )
+            self._snapshot_keys_name = self.name
+        return self._snapshot_keys
+
     @abstractmethod
     def to_x(self, price: float) -> float:
         """
@@ -37,7 +58,7 @@ class AbstractPosition(ABC):
         Returns:
             Total value of vault expressed in X.
         """
-        raise Exception(NotImplemented)
+        raise NotImplementedError
 
     @abstractmethod
     def to_y(self, price: float) -> float:
@@ -50,7 +71,7 @@ class AbstractPosition(ABC):
         Returns:
             Total value of vault expressed in Y.
         """
-        raise Exception(NotImplemented)
+        raise NotImplementedError
 
     @abstractmethod
     def to_xy(self, price: float) -> Tuple[float, float]:
@@ -63,7 +84,7 @@ class AbstractPosition(ABC):
         Returns:
             (amount of X, amount of Y)
         """
-        raise Exception(NotImplemented)
+        raise NotImplementedError
 
     @abstractmethod
     def snapshot(
@@ -79,7 +100,7 @@ class AbstractPosition(ABC):
 
         Returns: Position snapshot.
         """
-        raise Exception(NotImplemented)
+        raise NotImplementedError
 
 
 class BiCurrencyPosition(AbstractPosition):
@@ -96,6 +117,20 @@ class BiCurrencyPosition(AbstractPosition):
         y_interest: Interest on currency Y deposit expressed as a daily percentage yield.
     """
 
+    __slots__ = (
+        "x",
+        "y",
+        "x_interest",
+        "y_interest",
+        "_swap_fee",
+        "_swap_multiplier",
+        "gas_cost",
+        "total_gas_costs",
+        "previous_gain",
+    )
+
+    SNAPSHOT_SUFFIXES = ("value_x", "value_y", "total_gas_costs")
+
     def __init__(
         self,
         name: str,
@@ -122,6 +157,19 @@ class BiCurrencyPosition(AbstractPosition):
         self.total_gas_costs = 0
         self.previous_gain = None
 
+    @property
+    def swap_fee(self) -> float:
+        """
+        Exchange fee expressed as a percentage.
+        """
+        return self._swap_fee
+
+    @swap_fee.setter
+    def swap_fee(self, swap_fee: float) -> None:
+        # Swaps apply the fee as a multiplier, it is kept in sync with the fee here.
+        self._swap_fee = swap_fee
+        self._swap_multiplier = 1 - swap_fee
+
     def deposit(self, x: float, y: float) -> None:
         """
         Deposit X currency and Y currency to position.
@@ -211,8 +259,11 @@ class BiCurrencyPosition(AbstractPosition):
         else:
             self.previous_gain = date
         multiplier = (date - self.previous_gain).days
-        self.x *= (1 + self.x_interest) ** multiplier
-        self.y *= (1 + self.y_interest) ** multiplier
+        # Most vaults carry no interest, the compounding is skipped for them.
+        if multiplier and self.x_interest:
+            self.x *= (1 + self.x_interest) ** multiplier
+        if multiplier and self.y_interest:
+            self.y *= (1 + self.y_interest) ** multiplier
         self.previous_gain = date
 
     def to_x(self, price: float) -> float:
@@ -270,7 +321,7 @@ class BiCurrencyPosition(AbstractPosition):
         assert dx >= 0, f"Incorrect dX = {dx}"
 
         self.x -= dx
-        dy = price * (1 - self.swap_fee) * dx
+        dy = price * self._swap_multiplier * dx
         self.y += dy
         self.total_gas_costs += self.gas_cost
 
@@ -291,7 +342,7 @@ class BiCurrencyPosition(AbstractPosition):
         assert dy >= 0, f"Incorrect dY = {dy}"
 
         self.y -= dy
-        dx = (1 - self.swap_fee) * dy / price
+        dx = self._swap_multiplier * dy / price
         self.x += dx
         self.total_gas_costs += self.gas_cost
         return dx
@@ -309,12 +360,8 @@ class BiCurrencyPosition(AbstractPosition):
 
         Returns: Position snapshot.
         """
-        snapshot = {
-            f"{self.name}_value_x": float(self.x),
-            f"{self.name}_value_y": float(self.y),
-            f"{self.name}_total_gas_costs": float(self.total_gas_costs),
-        }
-        return snapshot
+        values = (float(self.x), float(self.y), float(self.total_gas_costs))
+        return dict(zip(self.snapshot_keys(), values))
 
 
 class UniV3Position(AbstractPosition):
@@ -331,6 +378,36 @@ class UniV3Position(AbstractPosition):
         gas_cost: Gas costs, expressed in Y currency.
     """
 
+    __slots__ = (
+        "lower_price",
+        "upper_price",
+        "fee_percent",
+        "gas_cost",
+        "liquidity",
+        "x_hold",
+        "y_hold",
+        "total_gas_costs",
+        "realized_loss_to_x",
+        "realized_loss_to_y",
+        "fees_x",
+        "_fees_x_earned_",
+        "fees_y",
+        "_fees_y_earned_",
+        "aligner",
+        "sqrt_lower",
+        "sqrt_upper",
+    )
+
+    SNAPSHOT_SUFFIXES = (
+        "value_x",
+        "value_y",
+        "fees_x",
+        "fees_y",
+        "il_to_x",
+        "il_to_y",
+        "total_gas_costs",
+    )
+
     def __init__(
         self,
         name: str,
@@ -347,9 +424,6 @@ class UniV3Position(AbstractPosition):
         self.fee_percent = fee_percent
         self.gas_cost = gas_cost
 
-        self.sqrt_lower = np.sqrt(self.lower_price)
-        self.sqrt_upper = np.sqrt(self.upper_price)
-
         self.liquidity = 0
 
         self.x_hold = 0
@@ -367,6 +441,8 @@ class UniV3Position(AbstractPosition):
         self._fees_y_earned_ = 0
 
         self.aligner = UniswapLiquidityAligner(self.lower_price, self.upper_price)
+        self.sqrt_lower = self.aligner.sqrt_lower
+        self.sqrt_upper = self.aligner.sqrt_upper
 
     def deposit(self, x: float, y: float, price: float) -> None:
         """
@@ -429,7 +505,13 @@ class UniV3Position(AbstractPosition):
                             must be Lx=Ly
                 """
 
-        d_liq = self.aligner.xy_to_liq(x=x, y=y, price=price)
+        # Same selection as ``aligner.xy_to_liq``, reusing the liquidities computed above.
+        if price >= self.upper_price:
+            d_liq = y_liq
+        elif price <= self.lower_price:
+            d_liq = x_liq
+        else:
+            d_liq = min(x_liq, y_liq)
 
         self.liquidity += d_liq
         self.x_hold += x
@@ -453,21 +535,21 @@ class UniV3Position(AbstractPosition):
         assert liq > 1e-16, f"Too small liquidity too withdraw = {liq}"
         assert price > 1e-16, f"Incorrect Price = {price}"
 
-        il_x_0 = self.impermanent_loss_to_x(price)
-        il_y_0 = self.impermanent_loss_to_y(price)
-
         x_out, y_out = self.aligner.liq_to_xy(price=price, liq=liq)
 
-        self.x_hold -= self.x_hold * (liq / self.liquidity)
-        self.y_hold -= self.y_hold * (liq / self.liquidity)
+        # Hold amounts leave in proportion to the burned liquidity,
+        # so the realized loss is the IL of the burned share: hold value minus received value.
+        share = liq / self.liquidity
+        x_hold_out = self.x_hold * share
+        y_hold_out = self.y_hold * share
 
-        self.liquidity -= liq
+        self.x_hold -= x_hold_out
+        self.y_hold -= y_hold_out
 
-        il_x_1 = self.impermanent_loss_to_x(price)
-        il_y_1 = self.impermanent_loss_to_y(price)
+        self.liquidity -= liq
 
-        self.realized_loss_to_x += il_x_0 - il_x_1
-        self.realized_loss_to_y += il_y_0 - il_y_1
+        self.realized_loss_to_x += (x_hold_out + y_hold_out / price) - (x_out + y_out / price)
+        self.realized_loss_to_y += (x_hold_out * price + y_hold_out) - (x_out * price + y_out)
 
         self.total_gas_costs += self.gas_cost
 
@@ -486,6 +568,16 @@ class UniV3Position(AbstractPosition):
         assert price_0 > 1e-16, f"Incorrect Price = {price_0}"
         assert price_1 > 1e-16, f"Incorrect Price = {price_1}"
 
+        # Price didn't move or both prices are on the same side out of the interval:
+        # amounts don't change, no fees earned.
+        if price_0 == price_1:
+            return
+        lower_price, upper_price = self.lower_price, self.upper_price
+        if (price_0 >= upper_price and price_1 >= upper_price) or (
+            price_0 <= lower_price and price_1 <= lower_price
+        ):
+            return
+
         x_0, y_0 = self.to_xy(price_0)
         x_1, y_1 = self.to_xy(price_1)
 
@@ -505,6 +597,65 @@ class UniV3Position(AbstractPosition):
         self.fees_y += fee_y
         self._fees_y_earned_ += fee_y
 
+    def charge_fees_series(self, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        | Vectorized ``charge_fees`` over consecutive swaps of a price series.
+        | Computes the fees the position would accumulate if ``charge_fees`` was called for every
+        | pair of neighbour prices, without changing the position.
+
+        Args:
+            prices: Array of prices of X in Y currency, ordered in time.
+
+        Returns:
+            Cumulative X fees and cumulative Y fees, arrays of the same length as ``prices``
+            starting from zero.
+        """
+        x, y = self.to_xy_vec(prices)
+        return self._cum_fees_from_xy(x, y)
+
+    def _cum_fees_from_xy(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Cumulative fees for consecutive swaps given position amounts along a price series.
+
+        Args:
+            x: Amounts of X in position for every price.
+            y: Amounts of Y in position for every price.
+
+        Returns:
+            Cumulative X fees and cumulative Y fees starting from zero.
+        """
+        dx, dy = np.diff(x), np.diff(y)
+
+        # Same branch as ``charge_fees``: price went down (Y decreased) -> fees in X, else fees in Y.
+        x_side = dy <= 0
+        fees_x = np.where(x_side, dx, 0.0) * self.fee_percent
+        fees_y = np.where(x_side, 0.0, dy) * self.fee_percent
+
+        cum_fees_x = np.concatenate(([0.0], np.cumsum(fees_x)))
+        cum_fees_y = np.concatenate(([0.0], np.cumsum(fees_y)))
+        return cum_fees_x, cum_fees_y
+
+    def charge_fees_batch(self, prices: np.ndarray) -> None:
+        """
+        | Charge fees for consecutive swaps of a price series at once.
+        | Equivalent to calling ``charge_fees`` for every pair of neighbour prices
+        | while the liquidity of the position stays the same.
+
+        Args:
+            prices: Array of prices of X in Y currency, ordered in time.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        assert prices.size > 0 and prices.min() > 1e-16, "Incorrect prices"
+
+        cum_fees_x, cum_fees_y = self.charge_fees_series(prices)
+        fee_x, fee_y = float(cum_fees_x[-1]), float(cum_fees_y[-1])
+
+        self.fees_x += fee_x
+        self._fees_x_earned_ += fee_x
+
+        self.fees_y += fee_y
+        self._fees_y_earned_ += fee_y
+
     def collect_fees(self) -> Tuple[float, float]:
         """
         Collect all gained fees.
@@ -629,6 +780,75 @@ class UniV3Position(AbstractPosition):
 
         return x, y
 
+    def to_xy_vec(self, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get amounts of X and Y in position for every price of a price series,
+        assuming the position is unchanged over the series.
+
+        Args:
+            prices: Array of prices of X in Y currency.
+
+        Returns:
+            Arrays of amounts of X and amounts of Y in position.
+        """
+        return self.aligner.liq_to_xy_vec(prices=prices, liq=self.liquidity)
+
+    def to_x_vec(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Vectorized ``to_x`` over a price series.
+
+        Args:
+            prices: Array of prices of X in Y currency.
+
+        Returns:
+            Values of UniswapV3 position expressed in X.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        x, y = self.to_xy_vec(prices)
+        return x + y / prices
+
+    def to_y_vec(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Vectorized ``to_y`` over a price series.
+
+        Args:
+            prices: Array of prices of X in Y currency.
+
+        Returns:
+            Values of UniswapV3 position expressed in Y.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        x, y = self.to_xy_vec(prices)
+        return x * prices + y
+
+    def impermanent_loss_to_x_vec(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Vectorized ``impermanent_loss_to_x`` over a price series.
+
+        Args:
+            prices: Array of prices of X in Y currency.
+
+        Returns:
+            Values of X il.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        v_hold = self.x_hold + self.y_hold / prices
+        return v_hold - self.to_x_vec(prices)
+
+    def impermanent_loss_to_y_vec(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Vectorized ``impermanent_loss_to_y`` over a price series.
+
+        Args:
+            prices: Array of prices of X in Y currency.
+
+        Returns:
+            Values of Y il.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        v_hold = self.x_hold * prices + self.y_hold
+        return v_hold - self.to_y_vec(prices)
+
     def snapshot(
         self, timestamp: datetime, price: float, block_number: Optional[int]
     ) -> dict:
@@ -643,18 +863,49 @@ class UniV3Position(AbstractPosition):
         Returns: Position snapshot
         """
         x, y = self.to_xy(price)
-        il_to_x, il_to_y = self.impermanent_loss_to_x(
-            price
-        ), self.impermanent_loss_to_y(price)
-
-        snapshot = {
-            f"{self.name}_value_x": float(x + self.fees_x),
-            f"{self.name}_value_y": float(y + self.fees_y),
-            f"{self.name}_fees_x": float(self.fees_x),
-            f"{self.name}_fees_y": float(self.fees_y),
-            f"{self.name}_il_to_x": float(il_to_x),
-            f"{self.name}_il_to_y": float(il_to_y),
-            f"{self.name}_total_gas_costs": float(self.total_gas_costs),
-            # f'{self.name}_current_liquidity': self.liquidity
-        }
-        return snapshot
+        # Same as ``impermanent_loss_to_x`` / ``impermanent_loss_to_y``, reusing x and y from above.
+        il_to_x = (self.x_hold + self.y_hold / price) - (x + y / price)
+        il_to_y = (self.x_hold * price + self.y_hold) - (x * price + y)
+
+        values = (
+            float(x + self.fees_x),
+            float(y + self.fees_y),
+            float(self.fees_x),
+            float(self.fees_y),
+            float(il_to_x),
+            float(il_to_y),
+            float(self.total_gas_costs),
+        )
+        return dict(zip(self.snapshot_keys(), values))
+
+    def simulate(self, prices: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        | Vectorized ``charge_fees`` + ``snapshot`` over a price series.
+        | Returns the snapshots the position would produce if fees were charged for every pair
+        | of neighbour prices and a snapshot was taken at each price, assuming the liquidity
+        | is unchanged over the series. The position itself is not changed.
+
+        Args:
+            prices: Array of prices of X in Y currency, ordered in time.
+
+        Returns:
+            Dict from snapshot key to array of values, one value per price.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        assert prices.size > 0 and prices.min() > 1e-16, "Incorrect prices"
+
+        x, y = self.to_xy_vec(prices)
+        cum_fees_x, cum_fees_y = self._cum_fees_from_xy(x, y)
+        fees_x = self.fees_x + cum_fees_x
+        fees_y = self.fees_y + cum_fees_y
+
+        values = (
+            x + fees_x,
+            y + fees_y,
+            fees_x,
+            fees_y,
+            (self.x_hold + self.y_hold / prices) - (x + y / prices),
+            (self.x_hold * prices + self.y_hold) - (x * prices + y),
+            np.full(prices.shape, float(self.total_gas_costs)),
+        )
+        return dict(zip(self.snapshot_keys(), values))
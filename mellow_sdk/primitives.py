@@ -4,6 +4,9 @@ from functools import total_ordering
 
 # TODO different fees to lp holders and swap operation
 
+# Number of whole UniswapV3 ticks (powers of 1.0001) in one power of 10.
+TICKS_PER_DECIMAL = math.floor(math.log(10, 1.0001))
+
 
 class Fee(Enum):
     """
@@ -186,7 +189,7 @@ class Pool:
         Returns:
             Tick diff. tick(eth/btc) - tick(wei/satoshi)
         """
-        return int(self.decimals_diff * math.floor(math.log(10, 1.0001)))
+        return int(self.decimals_diff * TICKS_PER_DECIMAL)
         # return int(math.floor(self.decimals_diff) * math.log(10, 1.0001))
 
     @property
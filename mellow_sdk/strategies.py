@@ -1,11 +1,10 @@
 from abc import ABC, abstractmethod
-import numpy as np
+import math
 import typing as tp
-import copy
 
-from mellow_sdk.uniswap_utils import UniswapLiquidityAligner
 from mellow_sdk.positions import UniV3Position, BiCurrencyPosition
 from mellow_sdk.primitives import Pool
+from mellow_sdk.utils import log
 
 
 class AbstractStrategy(ABC):
@@ -16,6 +15,8 @@ class AbstractStrategy(ABC):
         name: Unique name for the instance.
     """
 
+    __slots__ = ("name",)
+
     def __init__(self, name: str = None):
         if name is None:
             self.name = self.__class__.__name__
@@ -34,7 +35,7 @@ class AbstractStrategy(ABC):
         Returns:
             Name of event or None if there was no event.
         """
-        raise Exception(NotImplemented)
+        raise NotImplementedError
 
 
 class Hold(AbstractStrategy):
@@ -42,6 +43,8 @@ class Hold(AbstractStrategy):
     ``Hold`` is the passive strategy buy and hold.
     """
 
+    __slots__ = ("prev_gain_date",)
+
     def __init__(self, name: str = None):
         super().__init__(name)
         self.prev_gain_date = None
@@ -49,12 +52,13 @@ class Hold(AbstractStrategy):
     def rebalance(self, *args, **kwargs):
         timestamp = kwargs["record"]["timestamp"]
         portfolio = kwargs["portfolio"]
+        date = timestamp.date()
 
         if self.prev_gain_date is None:
-            self.prev_gain_date = timestamp.date()
+            self.prev_gain_date = date
 
             bi_cur = BiCurrencyPosition(
-                name=f"Vault",
+                name="Vault",
                 swap_fee=0,
                 gas_cost=0,
                 x=1,
@@ -65,10 +69,10 @@ class Hold(AbstractStrategy):
 
             portfolio.append(bi_cur)
 
-        if timestamp.date() > self.prev_gain_date:
+        if date > self.prev_gain_date:
             vault = portfolio.get_position("Vault")
-            vault.interest_gain(timestamp.date())
-            self.prev_gain_date = timestamp.date()
+            vault.interest_gain(date)
+            self.prev_gain_date = date
 
 
 class UniV3Passive(AbstractStrategy):
@@ -83,6 +87,8 @@ class UniV3Passive(AbstractStrategy):
         name: Unique name for the instance
     """
 
+    __slots__ = ("lower_price", "upper_price", "fee_percent", "gas_cost", "swap_fee")
+
     def __init__(
         self,
         lower_price: float,
@@ -110,8 +116,8 @@ class UniV3Passive(AbstractStrategy):
             self.create_uni_position(portfolio=portfolio, price=price)
             is_rebalanced = "mint"
 
-        if "UniV3Passive" in portfolio.positions:
-            uni_pos = portfolio.get_position("UniV3Passive")
+        uni_pos = portfolio.get_position("UniV3Passive")
+        if uni_pos is not None:
             uni_pos.charge_fees(price_before, price)
 
         return is_rebalanced
@@ -121,7 +127,7 @@ class UniV3Passive(AbstractStrategy):
         y = 1
 
         bi_cur = BiCurrencyPosition(
-            name=f"main_vault",
+            name="main_vault",
             swap_fee=self.swap_fee,
             gas_cost=self.gas_cost,
             x=x,
@@ -130,7 +136,7 @@ class UniV3Passive(AbstractStrategy):
             y_interest=None,
         )
         uni_pos = UniV3Position(
-            name=f"UniV3Passive",
+            name="UniV3Passive",
             lower_price=self.lower_price,
             upper_price=self.upper_price,
             fee_percent=self.fee_percent,
@@ -167,6 +173,8 @@ class StrategyByAddress(AbstractStrategy):
         name: Unique name for the instance.
     """
 
+    __slots__ = ("address", "decimal_diff", "fee_percent", "gas_cost")
+
     def __init__(
         self,
         address: str,
@@ -235,7 +243,9 @@ class StrategyByAddress(AbstractStrategy):
                 if "Uni" in name:
                     pos.charge_fees(price_before, price)
 
-        self.perform_clearing(portfolio)
+        # Position liquidity only changes on mint and burn, so only then emptied ones can appear.
+        if is_rebalanced == "mint" or is_rebalanced == "burn":
+            self.perform_clearing(portfolio)
         return is_rebalanced
 
     def perform_swap(self, portfolio, amount_0, amount_1):
@@ -265,10 +275,6 @@ class StrategyByAddress(AbstractStrategy):
 
         x_uni, y_uni = vault.withdraw(amount_0, amount_1)
 
-        price_lower, price_upper = self._tick_to_price(tick_lower), self._tick_to_price(
-            tick_upper
-        )
-
         if name in portfolio.positions:
             univ3_pos_old = portfolio.get_position(name)
             univ3_pos_old.liquidity = univ3_pos_old.liquidity + liquidity
@@ -276,6 +282,9 @@ class StrategyByAddress(AbstractStrategy):
             univ3_pos_old.y_hold += amount_1
             # univ3_pos_old.bi_currency.deposit(amount_0, amount_1)
         else:
+            # Bounds are only needed to open a new interval.
+            price_lower = self._tick_to_price(tick_lower)
+            price_upper = self._tick_to_price(tick_upper)
             univ3_pos = UniV3Position(
                 name, price_lower, price_upper, self.fee_percent, self.gas_cost
             )
@@ -297,23 +306,26 @@ class StrategyByAddress(AbstractStrategy):
 
             if liquidity > 0:
                 if liquidity > univ3_pos_old.liquidity:
-                    print("Diff =", liquidity - univ3_pos_old.liquidity)
+                    log.warning(
+                        "Burn exceeds position liquidity",
+                        name=name,
+                        diff=liquidity - univ3_pos_old.liquidity,
+                    )
                     x_out, y_out = univ3_pos_old.burn(univ3_pos_old.liquidity, price)
                 else:
                     x_out, y_out = univ3_pos_old.burn(liquidity, price)
             else:
-                print(f"Negative liq {liquidity}")
+                log.warning(
+                    "Negative liquidity to burn", name=name, liquidity=liquidity
+                )
         else:
-            print(f"There is no position to burn {name}")
+            log.warning("There is no position to burn", name=name)
 
     def perform_clearing(self, portfolio):
-        poses = copy.copy(portfolio.positions)
-        for name, pos in poses.items():
-            if "UniV3" in name:
-                univ3 = portfolio.get_position(name)
-                if univ3.liquidity < 1e1:
-                    portfolio.remove(name)
+        for name, pos in list(portfolio.positions.items()):
+            if "UniV3" in name and pos.liquidity < 1e1:
+                portfolio.remove(name)
 
     def _tick_to_price(self, tick):
-        price = np.power(1.0001, tick)
+        price = math.pow(1.0001, tick)
         return price
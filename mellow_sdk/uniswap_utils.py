@@ -1,3 +1,4 @@
+import math
 import numpy as np
 from typing import Tuple
 
@@ -10,14 +11,22 @@ class UniswapLiquidityAligner:
     Attributes:
         lower_price: Left bound for the UniswapV3 interval.
         upper_price: Right bound for the UniswapV3 interval.
+        sqrt_lower: Square root of ``lower_price``.
+        sqrt_upper: Square root of ``upper_price``.
     """
 
+    __slots__ = ("lower_price", "upper_price", "sqrt_lower", "sqrt_upper")
+
     def __init__(self, lower_price, upper_price):
         assert lower_price > 0, f"Incorect lower_price {lower_price}."
         assert upper_price > 0, f"Incorect upper_price {upper_price}."
         self.lower_price = lower_price
         self.upper_price = upper_price
 
+        # Interval bounds are fixed, so their square roots are computed once here.
+        self.sqrt_lower = math.sqrt(lower_price)
+        self.sqrt_upper = math.sqrt(upper_price)
+
     def real_price(self, price: float) -> float:
         """
         Args:
@@ -27,9 +36,9 @@ class UniswapLiquidityAligner:
             real_price = y / x
         """
 
-        sqrt_price = np.sqrt(price)
-        sqrt_lower = np.sqrt(self.lower_price)
-        sqrt_upper = np.sqrt(self.upper_price)
+        sqrt_price = math.sqrt(price)
+        sqrt_lower = self.sqrt_lower
+        sqrt_upper = self.sqrt_upper
 
         if sqrt_upper <= sqrt_price:
             return np.inf
@@ -56,9 +65,9 @@ class UniswapLiquidityAligner:
             The amount of liquidity for the given price and amount of tokens X.
         """
 
-        sqrt_lower = np.sqrt(self.lower_price)
-        sqrt_upper = np.sqrt(self.upper_price)
-        sqrt_price = np.sqrt(price)
+        sqrt_lower = self.sqrt_lower
+        sqrt_upper = self.sqrt_upper
+        sqrt_price = math.sqrt(price)
 
         if sqrt_price >= sqrt_upper:
             return 0.0
@@ -79,9 +88,9 @@ class UniswapLiquidityAligner:
             The amount of liquidity for the given price and amount of tokens Y.
         """
 
-        sqrt_lower = np.sqrt(self.lower_price)
-        sqrt_upper = np.sqrt(self.upper_price)
-        sqrt_price = np.sqrt(price)
+        sqrt_lower = self.sqrt_lower
+        sqrt_upper = self.sqrt_upper
+        sqrt_price = math.sqrt(price)
 
         if sqrt_price <= sqrt_lower:
             return 0.0
@@ -128,9 +137,9 @@ class UniswapLiquidityAligner:
         Returns:
             The amount of token X for a given amount of liquidity and a price range.
         """
-        sqrt_lower = np.sqrt(self.lower_price)
-        sqrt_upper = np.sqrt(self.upper_price)
-        sqrt_price = np.sqrt(price)
+        sqrt_lower = self.sqrt_lower
+        sqrt_upper = self.sqrt_upper
+        sqrt_price = math.sqrt(price)
 
         if sqrt_price >= sqrt_upper:
             return 0.0
@@ -150,9 +159,9 @@ class UniswapLiquidityAligner:
         Returns:
             The amount of token Y for a given amount of liquidity and market price.
         """
-        sqrt_lower = np.sqrt(self.lower_price)
-        sqrt_upper = np.sqrt(self.upper_price)
-        sqrt_price = np.sqrt(price)
+        sqrt_lower = self.sqrt_lower
+        sqrt_upper = self.sqrt_upper
+        sqrt_price = math.sqrt(price)
 
         if sqrt_price <= sqrt_lower:
             return 0.0
@@ -173,8 +182,37 @@ class UniswapLiquidityAligner:
         """
         assert liq >= 0, f"Incorrect liquidity {liq}"
         assert price > 1e-16, f"Incorrect price = {price}"
-        amount_x = self.liq_to_x(price, liq)
-        amount_y = self.liq_to_y(price, liq)
+
+        # Same as ``liq_to_x`` and ``liq_to_y``, but with a single sqrt of the price clamped to the interval.
+        sqrt_lower = self.sqrt_lower
+        sqrt_upper = self.sqrt_upper
+        sqrt_price = min(max(math.sqrt(price), sqrt_lower), sqrt_upper)
+
+        amount_x = liq * (sqrt_upper - sqrt_price) / (sqrt_price * sqrt_upper)
+        amount_y = liq * (sqrt_price - sqrt_lower)
+        return amount_x, amount_y
+
+    def liq_to_xy_vec(self, prices: np.ndarray, liq: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized ``liq_to_xy`` over an array of prices for a fixed amount of liquidity.
+
+        Args:
+            prices: Array of market prices.
+            liq: Amount of liquidity.
+
+        Returns:
+            (amounts of X, amounts of Y), arrays of the same shape as ``prices``.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        assert liq >= 0, f"Incorrect liquidity {liq}"
+        assert np.all(prices > 1e-16), "Incorrect prices"
+
+        sqrt_lower = self.sqrt_lower
+        sqrt_upper = self.sqrt_upper
+        sqrt_price = np.clip(np.sqrt(prices), sqrt_lower, sqrt_upper)
+
+        amount_x = liq * (sqrt_upper - sqrt_price) / (sqrt_price * sqrt_upper)
+        amount_y = liq * (sqrt_price - sqrt_lower)
         return amount_x, amount_y
 
     def check_xy_is_optimal(self, price, x, y):
@@ -201,9 +239,9 @@ class UniswapLiquidityAligner:
         assert x >= 0, f"Incorrect x = {x}"
         assert y >= 0, f"Incorrect y = {y}"
 
-        sqrt_lower = np.sqrt(self.lower_price)
-        sqrt_upper = np.sqrt(self.upper_price)
-        sqrt_price = np.sqrt(price)
+        sqrt_lower = self.sqrt_lower
+        sqrt_upper = self.sqrt_upper
+        sqrt_price = math.sqrt(price)
 
         liq_x = self.x_to_liq(price=price, x=x)
         liq_y = self.y_to_liq(price=price, y=y)
@@ -244,19 +282,21 @@ class UniswapLiquidityAligner:
         if price >= self.upper_price:
             return x, 0
 
+        # Liquidities of the given amounts are already known from the optimality check,
+        # only the per-unit liquidities of the swapped side are computed here.
+        swap_multiplier = 1 - swap_fee
         if liq_x > liq_y:
-            num = self.x_to_liq(price=price, x=x) - self.y_to_liq(price=price, y=y)
+            num = liq_x - liq_y
             den = self.x_to_liq(price=price, x=1.0) + self.y_to_liq(
-                price=price, y=(1 - swap_fee) * price
+                price=price, y=swap_multiplier * price
             )
             return num / den, 0
 
-        if liq_x < liq_y:
-            num = self.y_to_liq(price=price, y=y) - self.x_to_liq(price=price, x=x)
-            den = self.x_to_liq(price=price, x=(1 - swap_fee) / price) + self.y_to_liq(
-                price=price, y=1.0
-            )
-            return 0, num / den
+        num = liq_y - liq_x
+        den = self.x_to_liq(price=price, x=swap_multiplier / price) + self.y_to_liq(
+            price=price, y=1.0
+        )
+        return 0, num / den
 
     def get_amounts_after_optimal_swap(
         self, x: float, y: float, price: float, swap_fee: float
@@ -281,6 +321,7 @@ class UniswapLiquidityAligner:
         x -= dx
         y -= dy
 
-        x += dy * (1 - swap_fee) / price
-        y += dx * (1 - swap_fee) * price
+        swap_multiplier = 1 - swap_fee
+        x += dy * swap_multiplier / price
+        y += dx * swap_multiplier * price
         return x, y
@@ -1,6 +1,7 @@
-import pandas as pd
+import math
 import polars as pl
 import datetime
+from typing import Iterator, List, Tuple
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
@@ -8,6 +9,8 @@ from mellow_sdk.history import PortfolioHistory, UniPositionsHistory, RebalanceH
 from mellow_sdk.data import PoolDataUniV3
 from mellow_sdk.primitives import Pool
 
+MAX_PLOT_POINTS = 20000
+
 
 class PortfolioViewer:
     """
@@ -38,19 +41,28 @@ class PortfolioViewer:
             | fig5: Amount of X asset in portfolio,  amount of Y asset in portfolio.
             | fig6: Value and gAPY.
         """
+        return tuple(self.iter_portfolio())
+
+    def iter_portfolio(self) -> Iterator[go.Figure]:
+        """
+        | Lazily create the same plots as ``draw_portfolio``, in the same order.
+        | Each figure is built only when requested, so a caller that renders or saves them
+        | one by one never holds all of them in memory at once.
+
+        Returns:
+            Generator of plotly plots.
+        """
         portfolio_df = self.portfolio_history.calculate_stats()
         delta = datetime.timedelta(days=self.offset)
         start_date = portfolio_df["timestamp"][0] + delta
         portfolio_df_offset = portfolio_df.filter(pl.col("timestamp") >= start_date)
 
-        fig1 = self.draw_portfolio_to_x(portfolio_df_offset)
-        fig2 = self.draw_portfolio_to_y(portfolio_df_offset)
-        fig3 = self.draw_performance_x(portfolio_df_offset)
-        fig4 = self.draw_performance_y(portfolio_df_offset)
-        fig5 = self.draw_x_y(portfolio_df_offset)
-        fig6 = self.draw_gapy(portfolio_df_offset)
-
-        return fig1, fig2, fig3, fig4, fig5, fig6
+        yield self.draw_portfolio_to_x(portfolio_df_offset)
+        yield self.draw_portfolio_to_y(portfolio_df_offset)
+        yield self.draw_performance_x(portfolio_df_offset)
+        yield self.draw_performance_y(portfolio_df_offset)
+        yield self.draw_x_y(portfolio_df_offset)
+        yield self.draw_gapy(portfolio_df_offset)
 
     def draw_portfolio_to_x(self, portfolio_df: pl.DataFrame) -> go.Figure:
         """
@@ -63,53 +75,20 @@ class PortfolioViewer:
         Returns:
             Plotly plot.
         """
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_value_to_x"],
-                name=f"Portfolio value in {self.pool.token0.name}",
-            ),
-            secondary_y=False,
-        )
-
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_fees_to_x"],
-                name=f"Earned fees in {self.pool.token0.name}",
-                yaxis="y2",
+        token = self.pool.token0.name
+        return self._draw_two_axis(
+            portfolio_df,
+            main_col=("total_value_to_x", f"Portfolio value in {token}"),
+            sec_cols=[
+                ("total_fees_to_x", f"Earned fees in {token}"),
+                ("total_il_to_x", f"IL in {token}"),
+            ],
+            titles=(
+                f"Value to {token}",
+                f"Earned fees to {token}" + "<br>" + f" IL to {token}",
+                f"Portfolio Value, Fees and IL in {token}",
             ),
-            secondary_y=True,
-        )
-
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_il_to_x"],
-                name=f"IL in {self.pool.token0.name}",
-                yaxis="y2",
-            ),
-            secondary_y=True,
-        )
-
-        fig.update_xaxes(title_text="Timeline")
-        fig.update_yaxes(
-            title_text=f"Value to {self.pool.token0.name}", secondary_y=False
-        )
-        fig.update_yaxes(
-            title_text=f"Earned fees to {self.pool.token0.name}"
-            + "<br>"
-            + f" IL to {self.pool.token0.name}",
-            secondary_y=True,
-        )
-        fig.update_layout(
-            title=f"Portfolio Value, Fees and IL in {self.pool.token0.name}",
-            width=900,
-            height=500,
         )
-        return fig
 
     def draw_portfolio_to_y(self, portfolio_df: pl.DataFrame) -> go.Figure:
         """
@@ -120,53 +99,20 @@ class PortfolioViewer:
 
         Returns: Plotly plot.
         """
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_value_to_y"],
-                name=f"Portfolio value in {self.pool.token1.name}",
-            ),
-            secondary_y=False,
-        )
-
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_fees_to_y"],
-                name=f"Earned fees in {self.pool.token1.name}",
-                yaxis="y2",
-            ),
-            secondary_y=True,
-        )
-
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_il_to_y"],
-                name=f"IL in {self.pool.token1.name}",
-                yaxis="y2",
+        token = self.pool.token1.name
+        return self._draw_two_axis(
+            portfolio_df,
+            main_col=("total_value_to_y", f"Portfolio value in {token}"),
+            sec_cols=[
+                ("total_fees_to_y", f"Earned fees in {token}"),
+                ("total_il_to_y", f"IL in {token}"),
+            ],
+            titles=(
+                f"Value to {token}",
+                f"Earned fees to {token}" + "<br>" + f" IL to {token}",
+                f"Portfolio Value, Fees and IL in {token}",
             ),
-            secondary_y=True,
-        )
-
-        fig.update_xaxes(title_text="Timeline")
-        fig.update_yaxes(
-            title_text=f"Value to {self.pool.token1.name}", secondary_y=False
-        )
-        fig.update_yaxes(
-            title_text=f"Earned fees to {self.pool.token1.name}"
-            + "<br>"
-            + f" IL to {self.pool.token1.name}",
-            secondary_y=True,
         )
-        fig.update_layout(
-            title=f"Portfolio Value, Fees and IL in {self.pool.token1.name}",
-            width=900,
-            height=500,
-        )
-        return fig
 
     def draw_performance_x(self, portfolio_df: pl.DataFrame) -> go.Figure:
         """
@@ -177,38 +123,18 @@ class PortfolioViewer:
 
         Returns: Plotly plot.
         """
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_value_to_x"],
-                name=f"Portfolio value in {self.pool.token0.name}",
-            ),
-            secondary_y=False,
-        )
-
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["portfolio_apy_x"],
-                name=f"APY in {self.pool.token0.name}",
-                yaxis="y2",
+        token = self.pool.token0.name
+        return self._draw_two_axis(
+            portfolio_df,
+            main_col=("total_value_to_x", f"Portfolio value in {token}"),
+            sec_cols=[("portfolio_apy_x", f"APY in {token}")],
+            titles=(
+                f"Value to {token}",
+                f"APY in {token}",
+                f"Portfolio Value and APY in {token}",
             ),
-            secondary_y=True,
         )
 
-        fig.update_xaxes(title_text="Timeline")
-        fig.update_yaxes(
-            title_text=f"Value to {self.pool.token0.name}", secondary_y=False
-        )
-        fig.update_yaxes(title_text=f"APY in {self.pool.token0.name}", secondary_y=True)
-        fig.update_layout(
-            title=f"Portfolio Value and APY in {self.pool.token0.name}",
-            width=900,
-            height=500,
-        )
-        return fig
-
     def draw_performance_y(self, portfolio_df: pl.DataFrame) -> go.Figure:
         """
         Plot portfolio value in Y, portfolio APY in Y.
@@ -218,38 +144,68 @@ class PortfolioViewer:
 
         Returns: Plotly plot.
         """
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_value_to_y"],
-                name=f"Portfolio value in {self.pool.token1.name}",
+        token = self.pool.token1.name
+        return self._draw_two_axis(
+            portfolio_df,
+            main_col=("total_value_to_y", f"Portfolio value in {token}"),
+            sec_cols=[("portfolio_apy_y", f"APY in {token}")],
+            titles=(
+                f"Value to {token}",
+                f"APY in {token}",
+                f"Portfolio Value and APY in {token}",
             ),
-            secondary_y=False,
         )
 
+    def _draw_two_axis(
+        self,
+        portfolio_df: pl.DataFrame,
+        main_col: Tuple[str, str],
+        sec_cols: List[Tuple[str, str]],
+        titles: Tuple[str, str, str],
+    ) -> go.Figure:
+        """
+        Plot one column on the main y axis and several columns on the secondary y axis.
+        Long histories are thinned to at most ``MAX_PLOT_POINTS`` points per trace.
+
+        Args:
+            portfolio_df: Dataframe from ``PortfolioHistory.calculate_stats()``.
+            main_col: (column, trace name) for the main y axis.
+            sec_cols: List of (column, trace name) for the secondary y axis.
+            titles: (main y axis title, secondary y axis title, plot title).
+
+        Returns:
+            Plotly plot.
+        """
+        stride = math.ceil(portfolio_df.height / MAX_PLOT_POINTS)
+        if stride > 1:
+            portfolio_df = portfolio_df[::stride]
+
+        # Plain numpy arrays pass plotly validation without per-element coercion.
+        timestamps = portfolio_df["timestamp"].to_numpy()
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+
+        col, name = main_col
         fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["portfolio_apy_y"],
-                name=f"APY in {self.pool.token1.name}",
-                yaxis="y2",
-            ),
-            secondary_y=True,
+            go.Scatter(x=timestamps, y=portfolio_df[col].to_numpy(), name=name),
+            secondary_y=False,
         )
+        for col, name in sec_cols:
+            fig.add_trace(
+                go.Scatter(
+                    x=timestamps, y=portfolio_df[col].to_numpy(), name=name, yaxis="y2"
+                ),
+                secondary_y=True,
+            )
 
+        main_title, sec_title, title = titles
+        if portfolio_df.height > 0:
+            # Time axis is sorted, so its range is known without plotly scanning every trace.
+            time_range = [portfolio_df["timestamp"][0], portfolio_df["timestamp"][-1]]
+            fig.update_xaxes(range=time_range, autorange=False)
         fig.update_xaxes(title_text="Timeline")
-        fig.update_yaxes(
-            title_text=f"Value to {self.pool.token1.name}", secondary_y=False
-        )
-        fig.update_yaxes(title_text=f"APY in {self.pool.token1.name}", secondary_y=True)
-
-        fig.update_layout(
-            title=f"Portfolio Value and APY in {self.pool.token1.name}",
-            width=900,
-            height=500,
-        )
+        fig.update_yaxes(title_text=main_title, secondary_y=False)
+        fig.update_yaxes(title_text=sec_title, secondary_y=True)
+        fig.update_layout(title=title, width=900, height=500)
         return fig
 
     def draw_x_y(self, portfolio_df: pl.DataFrame) -> go.Figure:
@@ -261,41 +217,18 @@ class PortfolioViewer:
 
         Returns: Plotly plot.
         """
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_value_x"],
-                name=f"Portfolio value in {self.pool.token0.name}",
+        token0, token1 = self.pool.token0.name, self.pool.token1.name
+        return self._draw_two_axis(
+            portfolio_df,
+            main_col=("total_value_x", f"Portfolio value in {token0}"),
+            sec_cols=[("total_value_y", f"Portfolio value in {token1}")],
+            titles=(
+                f"Value in {token0}",
+                f"Value in {token1}",
+                f"Portfolio Value in {token0}, {token1}",
             ),
-            secondary_y=False,
         )
 
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_value_y"],
-                name=f"Portfolio value in {self.pool.token1.name}",
-                yaxis="y2",
-            ),
-            secondary_y=True,
-        )
-
-        fig.update_xaxes(title_text="Timeline")
-        fig.update_yaxes(
-            title_text=f"Value in {self.pool.token0.name}", secondary_y=False
-        )
-        fig.update_yaxes(
-            title_text=f"Value in {self.pool.token1.name}", secondary_y=True
-        )
-        fig.update_layout(
-            title=f"Portfolio Value in {self.pool.token0.name}, {self.pool.token1.name}",
-            width=900,
-            height=500,
-        )
-        return fig
-
     def draw_gapy(self, portfolio_df: pl.DataFrame) -> go.Figure:
         """
         Plot portfolio value and gAPY in Y. Note that gAPY in X equals gAPY in Y.
@@ -306,38 +239,18 @@ class PortfolioViewer:
         Returns:
             Plotly plot.
         """
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["total_value_to_y"],
-                name=f"Portfolio value to {self.pool.token1.name}",
+        token = self.pool.token1.name
+        return self._draw_two_axis(
+            portfolio_df,
+            main_col=("total_value_to_y", f"Portfolio value to {token}"),
+            sec_cols=[("g_apy", "Portfolio gAPY")],
+            titles=(
+                f"Value to {token}",
+                "gAPY",
+                f"Portfolio value and gAPY.Pool {self.pool._name}.",
             ),
-            secondary_y=False,
         )
 
-        fig.add_trace(
-            go.Scatter(
-                x=portfolio_df["timestamp"].to_list(),
-                y=portfolio_df["g_apy"],
-                name=f"Portfolio gAPY",
-            ),
-            secondary_y=True,
-        )
-
-        fig.update_xaxes(title_text="Timeline")
-        fig.update_yaxes(
-            title_text=f"Value to {self.pool.token1.name}", secondary_y=False
-        )
-        fig.update_yaxes(title_text="gAPY", secondary_y=True)
-        fig.update_layout(
-            title=f"Portfolio value and gAPY." f"Pool {self.pool._name}.",
-            width=900,
-            height=500,
-        )
-        return fig
-
 
 class UniswapViewer:
     """
@@ -360,45 +273,57 @@ class UniswapViewer:
         Returns:
             Plot with UniswapV3 position intervals and market price.
         """
-        intervals_df = self.uni_postition_history.to_df()
-        positions = intervals_df["name"].unique().to_list()
-        positions_num = len(positions) - 1
+        intervals_df = self.uni_postition_history.to_df().sort(by=["name", "timestamp"])
+
+        # All positions go into one pair of traces, ``None`` breaks the line between positions.
+        timestamps, upper_bounds, lower_bounds = [], [], []
+        prev_name = None
+        for name, timestamp, upper, lower in zip(
+            intervals_df["name"].to_list(),
+            intervals_df["timestamp"].to_list(),
+            intervals_df["upper_bound"].to_list(),
+            intervals_df["lower_bound"].to_list(),
+        ):
+            if prev_name is not None and name != prev_name:
+                timestamps.append(None)
+                upper_bounds.append(None)
+                lower_bounds.append(None)
+            timestamps.append(timestamp)
+            upper_bounds.append(upper)
+            lower_bounds.append(lower)
+            prev_name = name
 
         fig = go.Figure()
-        for i, name in enumerate(positions):
-            pos = intervals_df.filter(pl.col("name") == name)
-
-            batch = [
+        fig.add_traces(
+            [
                 go.Scatter(
-                    name="Lower Bound",
-                    x=pos["timestamp"].to_list(),
-                    y=pos["upper_bound"].to_list(),
+                    name="Upper Bound",
+                    x=timestamps,
+                    y=upper_bounds,
                     mode="lines",
                     marker=dict(color="blue"),
                     line=dict(width=1),
                     legendgroup="Interval",
-                    showlegend=(False if i != positions_num else True),
                 ),
                 go.Scatter(
-                    name="Upper Bound",
-                    x=pos["timestamp"].to_list(),
-                    y=pos["lower_bound"].to_list(),
+                    name="Lower Bound",
+                    x=timestamps,
+                    y=lower_bounds,
                     marker=dict(color="blue"),
                     line=dict(width=1),
                     mode="lines",
                     fillcolor="rgba(0, 0, 200, 0.1)",
                     fill="tonexty",
                     legendgroup="Interval",
-                    showlegend=(False if i != positions_num else True),
                 ),
             ]
-            fig.add_traces(batch)
+        )
 
         fig.add_trace(
             go.Scatter(
                 name="Price",
-                x=swaps_df["timestamp"].to_list(),
-                y=swaps_df["price"].to_list(),
+                x=swaps_df["timestamp"].to_numpy(),
+                y=swaps_df["price"].to_numpy(),
                 mode="lines",
                 line=dict(color="rgb(0, 200, 0)"),
             )
@@ -437,8 +362,8 @@ class RebalanceViewer:
         fig = go.Figure()
         fig.add_trace(
             go.Scatter(
-                x=swaps_df["timestamp"].to_list(),
-                y=swaps_df["price"],
+                x=swaps_df["timestamp"].to_numpy(),
+                y=swaps_df["price"].to_numpy(),
                 name="Price",
             )
         )
@@ -449,8 +374,8 @@ class RebalanceViewer:
 
             fig.add_trace(
                 go.Scatter(
-                    x=rebalance_df_slice["timestamp"].to_list(),
-                    y=rebalance_df_slice["price"],
+                    x=rebalance_df_slice["timestamp"].to_numpy(),
+                    y=rebalance_df_slice["price"].to_numpy(),
                     mode="markers",
                     # marker_color='red',
                     marker_size=7,
@@ -506,8 +431,8 @@ class LiquidityViewer:
 
         fig.add_trace(
             go.Scatter(
-                x=df3["date"].to_list(),
-                y=df3["price"].to_list(),
+                x=df3["date"].to_numpy(),
+                y=df3["price"].to_numpy(),
                 name="Price",
             ),
             secondary_y=False,
@@ -515,8 +440,8 @@ class LiquidityViewer:
 
         fig.add_trace(
             go.Scatter(
-                x=df3["date"].to_list(),
-                y=df3["liq"].to_list(),
+                x=df3["date"].to_numpy(),
+                y=df3["liq"].to_numpy(),
                 name="Liquidity",
                 yaxis="y2",
             ),
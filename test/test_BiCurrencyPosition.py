@@ -3,6 +3,7 @@
     functions:
         rebalance - YES
         interest_gain - YES
+        snapshot - YES
 
         python -m unittest test/test_BiCurrencyPosition.py
 """
@@ -107,6 +108,22 @@ class TestBiCurrencyPosition(unittest.TestCase):
             np.allclose([pos.x, pos.y], [348.9119856672034, 370836.27527132386], atol=1e-08, rtol=0)
         )
 
+    def test_snapshot_rename(self):
+        pos = BiCurrencyPosition(
+            name='Vault',
+            swap_fee=0.0003,
+            gas_cost=0.01,
+            x=1,
+            y=2,
+        )
+
+        snapshot = pos.snapshot(timestamp=datetime(2021, 1, 1), price=1, block_number=None)
+        self.assertEqual(snapshot, {'Vault_value_x': 1.0, 'Vault_value_y': 2.0, 'Vault_total_gas_costs': 0.0})
+
+        pos.rename('Main')
+        snapshot = pos.snapshot(timestamp=datetime(2021, 1, 1), price=1, block_number=None)
+        self.assertEqual(list(snapshot), ['Main_value_x', 'Main_value_y', 'Main_total_gas_costs'])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,66 @@
+"""
+    Test PortfolioHistory
+    functions:
+        calculate_stats - YES
+        _column_buckets - YES
+
+        python -m unittest test/test_PortfolioHistory.py
+"""
+
+
+import unittest
+import polars as pl
+
+from datetime import datetime, timedelta
+from mellow_sdk.history import PortfolioHistory
+from mellow_sdk.portfolio import Portfolio
+from mellow_sdk.positions import BiCurrencyPosition
+
+
+class TestPortfolioHistory(unittest.TestCase):
+    """
+        test PortfolioHistory
+    """
+
+    def setUp(self):
+        pos = BiCurrencyPosition(
+            name='Vault',
+            swap_fee=0.0003,
+            gas_cost=0.01,
+            x=1,
+            y=1,
+        )
+        self.portfolio = Portfolio('main', [pos])
+        self.history = PortfolioHistory()
+        start = datetime(2022, 1, 1)
+        for i in range(5):
+            self.history.add_snapshot(self.portfolio.snapshot(start + timedelta(days=i), 1 + 0.1 * i, None))
+
+    def test_calculate_stats_cache_is_not_shared(self):
+        """
+            run test
+        Returns:
+        """
+        stats = self.history.calculate_stats()
+        columns, shape = stats.columns, stats.shape
+
+        stats.hstack([pl.Series('extra', [0.0] * stats.height)], in_place=True)
+        stats.drop_in_place('price')
+
+        stats_again = self.history.calculate_stats()
+        self.assertEqual(stats_again.columns, columns)
+        self.assertEqual(stats_again.shape, shape)
+
+    def test_column_buckets_are_immutable(self):
+        """
+            run test
+        Returns:
+        """
+        columns = tuple(self.history.to_df().columns)
+        buckets = PortfolioHistory._column_buckets(columns)
+        self.assertEqual(buckets['value_x'], ('Vault_value_x',))
+        self.assertIsInstance(buckets['value_y'], tuple)
+
+
+if __name__ == "__main__":
+    unittest.main()
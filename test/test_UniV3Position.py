@@ -4,7 +4,11 @@
         mint - YES
         burn - YES
         charge_fees - YES
+        charge_fees_series - YES
+        charge_fees_batch - YES
+        simulate - YES
         swap_to_optimal - YES
+        vectorized to_xy / to_x / to_y / impermanent_loss - YES
 
     python -m unittest test/test_UniV3Position.py
 
@@ -218,6 +222,91 @@ class TestUniswapLiquidityAligner(unittest.TestCase):
         self.assertAlmostEqual(self.pos._fees_x_earned_, expected[0])
         self.assertAlmostEqual(self.pos._fees_y_earned_, expected[1])
 
+    def test_vec_matches_scalar(self):
+        self.pos.mint(x=100, y=0, price=10)
+        self.pos.burn(self.pos.liquidity / 2, price=20)
+        prices = np.array([5, 10, 11, 15, 20, 29.9, 30, 45])
+
+        xs, ys = self.pos.to_xy_vec(prices)
+        scalar = np.array([self.pos.to_xy(price) for price in prices])
+        self.assertTrue(np.allclose(xs, scalar[:, 0], atol=1e-08, rtol=0))
+        self.assertTrue(np.allclose(ys, scalar[:, 1], atol=1e-08, rtol=0))
+
+        for vec, func in [
+            (self.pos.to_x_vec, self.pos.to_x),
+            (self.pos.to_y_vec, self.pos.to_y),
+            (self.pos.impermanent_loss_to_x_vec, self.pos.impermanent_loss_to_x),
+            (self.pos.impermanent_loss_to_y_vec, self.pos.impermanent_loss_to_y),
+        ]:
+            self.assertTrue(np.allclose(vec(prices), [func(price) for price in prices], atol=1e-08, rtol=0))
+
+    def test_charge_fees_series(self):
+        self.pos = UniV3Position(
+            name='TestPos',
+            lower_price=10,
+            upper_price=30,
+            fee_percent=0.5,
+            gas_cost=1,
+        )
+        self.pos.mint(x=100, y=0, price=10)
+        prices = np.array([9, 11, 30, 31, 11, 10, 9, 20, 20, 15])
+
+        cum_fees_x, cum_fees_y = self.pos.charge_fees_series(prices)
+
+        for price_0, price_1 in zip(prices[:-1], prices[1:]):
+            self.pos.charge_fees(price_0, price_1)
+
+        self.assertAlmostEqual(cum_fees_x[0], 0)
+        self.assertAlmostEqual(cum_fees_y[0], 0)
+        self.assertAlmostEqual(cum_fees_x[-1], self.pos._fees_x_earned_)
+        self.assertAlmostEqual(cum_fees_y[-1], self.pos._fees_y_earned_)
+
+
+    def test_charge_fees_batch(self):
+        prices = [9, 11, 30, 31, 11, 10, 9, 20, 20, 15]
+        batch_pos, loop_pos = [
+            UniV3Position(name=name, lower_price=10, upper_price=30, fee_percent=0.5, gas_cost=1)
+            for name in ('BatchPos', 'LoopPos')
+        ]
+        batch_pos.mint(x=100, y=0, price=10)
+        loop_pos.mint(x=100, y=0, price=10)
+
+        batch_pos.charge_fees_batch(np.array(prices))
+        for price_0, price_1 in zip(prices[:-1], prices[1:]):
+            loop_pos.charge_fees(price_0, price_1)
+
+        self.assertAlmostEqual(batch_pos.fees_x, loop_pos.fees_x)
+        self.assertAlmostEqual(batch_pos.fees_y, loop_pos.fees_y)
+        self.assertAlmostEqual(batch_pos._fees_x_earned_, loop_pos._fees_x_earned_)
+        self.assertAlmostEqual(batch_pos._fees_y_earned_, loop_pos._fees_y_earned_)
+
+    def test_charge_fees_batch_assert_price(self):
+        with self.assertRaises(AssertionError):
+            self.pos.charge_fees_batch(np.array([10, 0, 12]))
+
+
+    def test_simulate(self):
+        prices = [9, 11, 30, 31, 11, 10, 9, 20, 20, 15]
+        self.pos = UniV3Position(
+            name='TestPos',
+            lower_price=10,
+            upper_price=30,
+            fee_percent=0.5,
+            gas_cost=1,
+        )
+        self.pos.mint(x=100, y=0, price=10)
+
+        simulated = self.pos.simulate(np.array(prices))
+
+        snapshots = [self.pos.snapshot(None, prices[0], None)]
+        for price_0, price_1 in zip(prices[:-1], prices[1:]):
+            self.pos.charge_fees(price_0, price_1)
+            snapshots.append(self.pos.snapshot(None, price_1, None))
+
+        self.assertEqual(list(simulated), list(snapshots[0]))
+        for key, values in simulated.items():
+            self.assertTrue(np.allclose(values, [snap[key] for snap in snapshots], atol=1e-08, rtol=0))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,6 +3,7 @@
     functions:
         xy_to_liq - Yes
         liq_to_optimal_xy - Yes
+        liq_to_xy_vec - Yes
         check_xy_is_optimal - Yes
 
     python -m unittest test/test_UniswapLiquidityAligner.py
@@ -349,6 +350,22 @@ class TestUniswapLiquidityAligner(unittest.TestCase):
             self.aligner.liq_to_xy(price=1, liq=-1)
         self.assertTrue('Incorrect liquidity' in str(context.exception))
 
+    @parameterized.expand(test_liq_to_optimal_xy_arr)
+    def test_liq_to_xy_vec(self, input_val, expected):
+        """
+            run test
+        Returns:
+        """
+
+        xs, ys = self.aligner.liq_to_xy_vec(prices=np.array([input_val['price']]), liq=input_val['liq'])
+
+        self.assertTrue(np.allclose((xs[0], ys[0]), expected, atol=1e-8, rtol=0))
+
+    def test_liq_to_xy_vec_assert_price(self):
+        with self.assertRaises(Exception) as context:
+            self.aligner.liq_to_xy_vec(prices=np.array([1, 0]), liq=1)
+        self.assertTrue('Incorrect prices' in str(context.exception))
+
     @parameterized.expand(test_check_xy_is_optimal_arr)
     def test_check_xy_is_optimal(self, input_val, expected):
         """